@@ -4,12 +4,13 @@ from metaflow.meta import FOREACH, IFF, IFN, IS_STEP, JOIN, META_KEY, PREV_STEP
 
 def get_meta(f, default=None):
     """Get (and set to empty dict if absent) a step function's metadata object."""
-    if hasattr(f, META_KEY):
-        return getattr(f, META_KEY)
-    else:
-        meta = default or {}
-        setattr(f, META_KEY, meta)
-        return meta
+    # Go through `f.__dict__` directly: step functions always carry their metadata in the instance
+    # dict, and this skips the attribute-protocol machinery that getattr/setattr would pay.
+    d = f.__dict__
+    meta = d.get(META_KEY)
+    if meta is None:
+        meta = d[META_KEY] = default or {}
+    return meta
 
 
 def step(arg):
@@ -1,69 +1,280 @@
 import ast
+import os
+import weakref
+from copy import deepcopy
+from functools import partial
 
 import metaflow as mf
-from metaflow.flowspec import FlowSpecMeta
-from metaflow.graph import parse_flow
+from metaflow.flowspec import FlowSpecMeta, infer_file
+from metaflow.graph import DAGNode, find_root
 from metaflow.meta import FOREACH, IS_STEP, JOIN, META_KEY, ORIG_FN, PREV_STEP
 from metaflow.parameters import Parameter
 from .decorators import get_meta
 
+# `parse_steps` caches: parsed source files (keyed by path, invalidated by mtime) and per-class step
+# parses (keyed by the FlowSpec class). Repeated imports and subclass chains re-visit the same files
+# and base classes, so these keep the MRO walk O(unique bases) instead of O(subclass²).
+# The step cache holds its class keys weakly: `FlowSpecMeta.__new__` parses steps via a throwaway
+# intermediate class that is otherwise garbage after the real class is built, and a strong-keyed
+# dict would pin every such class (plus its dict and methods) for the life of the process.
+_AST_CACHE = {}
+_STEP_CACHE = weakref.WeakKeyDictionary()
 
-class StepVisitor(ast.NodeVisitor):
-    def __init__(self, nodes, flow, file):
-        self.nodes = nodes
-        self.flow = flow
-        self.file = file
-        super(StepVisitor, self).__init__()
+# Successor-dispatch helpers: `wrap_step` below partially applies these (binding everything except
+# `self`) instead of building per-step lambda closures; `partial` dispatch is cheaper and the bound
+# arguments are inspectable.
+def _next_linear(nxt, self):
+    self.next(getattr(self, nxt))
 
-    def visit_FunctionDef(self, node):
-        name = node.name
-        func = getattr(self.flow, name)
-        if getattr(func, META_KEY, {}).get(IS_STEP):
-            from metaflow.graph import DAGNode
 
-            self.nodes[name] = DAGNode(node, func, parse=False, file=self.file)
-        elif getattr(func, IS_STEP, None):
-            # As a safety check, make sure we are not applying the `metaflow.api` Metaclass to a `metaflow.FlowSpec`
-            raise ValueError(func)
+def _next_foreach(nxt, field, self):
+    self.next(getattr(self, nxt), foreach=field)
+
+
+def _next_split(out_funcs, self):
+    self.next(*[getattr(self, nxt) for nxt in out_funcs])
+
+
+# Successor-builder dispatch table, keyed by node type; `wrap_step` looks the builder up here
+# instead of walking an if/elif chain per step.
+def _build_next_foreach(name, node):
+    [nxt] = node.out_funcs
+    return partial(_next_foreach, nxt, node.foreach_param)
+
+
+def _build_next_split(name, node):
+    out_funcs = node.out_funcs
+    assert len(out_funcs) > 1
+    return partial(_next_split, out_funcs)
+
+
+def _build_next_join(name, node):
+    out_funcs = node.out_funcs
+    if len(out_funcs) == 1:
+        return partial(_next_linear, out_funcs[0])
+    return partial(_next_split, out_funcs)
+
+
+def _build_next_linear(name, node):
+    out_funcs = node.out_funcs
+    if len(out_funcs) != 1:
+        raise RuntimeError(
+            "node %s: expected 1 out_func, found %d%s"
+            % (
+                name,
+                len(out_funcs),
+                (" %s" % ",".join(out_funcs)) if out_funcs else "",
+            )
+        )
+    return partial(_next_linear, out_funcs[0])
+
+
+_NEXT_FN_BUILDERS = {
+    "foreach": _build_next_foreach,
+    "split": _build_next_split,
+    "join": _build_next_join,
+    "linear": _build_next_linear,
+}
+
+
+# Synthetic start/end step stubs, parsed once at import; the metaclass copies these (patching in the
+# actual first-step name, for `start`) instead of re-running `ast.parse` per class.
+[_START_STUB] = ast.parse("def start(self): self.next(self.FIRST_STEP)").body
+[_END_STUB] = ast.parse("def end(self): pass").body
+
+
+def parse_source(file):
+    """Read and parse `file`, caching the result by path + mtime.
+
+    :return: (source, module-body AST nodes)
+    """
+    mtime = os.stat(file).st_mtime
+    cached = _AST_CACHE.get(file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    # Read as bytes in one buffered pass and decode once; text mode would re-scan for newlines and
+    # pay codec overhead per chunk.
+    with open(file, "rb", buffering=1 << 20) as f:
+        source = f.read().decode("utf-8")
+    tree = ast.parse(source).body
+    _AST_CACHE[file] = (mtime, source, tree)
+    return source, tree
+
+
+def own_steps(flow):
+    """Parse (and memoize) the `@step` nodes defined directly in `flow`'s class body.
+
+    The metaclass mutates `DAGNode`s while inferring graph structure, so cache hits return fresh
+    `DAGNode`s rather than the cached ones (which may be shared across subclasses)."""
+    cached = _STEP_CACHE.get(flow)
+    if cached is None:
+        # Classes that define no step methods (e.g. plain mixins) don't need their source parsed at
+        # all; old-style steps (bare IS_STEP attr) still fall through to the scan below, which
+        # rejects them.
+        if not any(
+            getattr(v, META_KEY, {}).get(IS_STEP) or getattr(v, IS_STEP, False)
+            for v in flow.__dict__.values()
+        ):
+            _STEP_CACHE[flow] = cached = []
+            return {}
+        file = flow.file
+        source, tree = parse_source(file)
+        root = find_root(tree, file, flow.name)
+        cached = []
+        # Steps are direct children of the ClassDef; scan its body rather than paying a full
+        # ast.NodeVisitor traversal
+        for node in root.body:
+            if not isinstance(node, ast.FunctionDef):
+                continue
+            func = getattr(flow, node.name)
+            if getattr(func, META_KEY, {}).get(IS_STEP):
+                cached.append((node.name, node, func))
+            elif getattr(func, IS_STEP, None):
+                # As a safety check, make sure we are not applying the `metaflow.api` Metaclass to a `metaflow.FlowSpec`
+                raise ValueError(func)
+        _STEP_CACHE[flow] = cached
+    file = flow.file
+    return {
+        name: DAGNode(node, func, parse=False, file=file) for name, node, func in cached
+    }
 
 
 def parse_steps(flow):
     nodes = {}
 
-    # Parse graph nodes (`@step`s) from `FlowSpec` subclasses
+    # Parse graph nodes (`@step`s) from `FlowSpec` base classes. Each base is visited once (the
+    # previous implementation recursed into every base's full MRO, re-visiting shared ancestors once
+    # per level); the seen-set DFS preserves the contribution order of that recursion.
     mro = flow.mro()
     assert mro[0] is flow
+    seen = {flow}
 
-    bases = [
-        base
-        for base in mro[1:]
-        if base is not mf.FlowSpec and issubclass(base, mf.FlowSpec)
-    ]
-    for base in bases:
-        nodes.update(parse_steps(base)[0])
+    def visit(cur):
+        seen.add(cur)
+        for base in cur.mro()[1:]:
+            if (
+                base not in seen
+                and base is not mf.FlowSpec
+                and issubclass(base, mf.FlowSpec)
+            ):
+                visit(base)
+        nodes.update(own_steps(cur))
+
+    for base in mro[1:]:
+        if (
+            base not in seen
+            and base is not mf.FlowSpec
+            and issubclass(base, mf.FlowSpec)
+        ):
+            visit(base)
 
     # Parse graph nodes (`@step`s) from this `FlowSpec` class
     file = flow.file
     name = flow.name
-    with open(file, "r") as f:
-        source = f.read()
-
-    root, tree = parse_flow(file, name)
+    source, tree = parse_source(file)
+    root = find_root(tree, file, name)
 
     # Infer an ending line number (used when reporting/logging a @step's source location). Python <3.8 doesn't set
     # `end_lineno`, so this is a best-effort calculation that should be consistent across Python versions.
-    successors = [nxt for cur, nxt in zip(tree, tree[1:]) if cur is root]
-    if successors:
-        [successor] = successors
-        end_lineno = successor.lineno - 1
+    idx = tree.index(root)
+    if idx + 1 < len(tree):
+        end_lineno = tree[idx + 1].lineno - 1
     else:
-        end_lineno = len(source.split("\n"))
+        end_lineno = source.count("\n") + 1
 
-    StepVisitor(nodes, flow, file).visit(root)
+    nodes.update(own_steps(flow))
 
     return nodes, tree, root, end_lineno
 
 
+def _process_pair(
+    pk, pv, ck, cv, nodes, cls, FOREACH=FOREACH, JOIN=JOIN, PREV_STEP=PREV_STEP
+):
+    """Infer graph structure from one adjacent (previous, current) node pair.
+
+    Called once per pair in a tight loop by the metaclass; lives at module scope (with the meta-key
+    constants bound as defaults) so every name resolves via LOAD_FAST instead of walking enclosing
+    scopes."""
+    if ck == "end":
+        if cv.type is None:
+            cv.type = "end"
+        else:
+            assert cv.type == "end"
+        cv.in_funcs = {pk}
+        if pv.out_funcs:
+            assert pk == "start"
+            assert pv.out_funcs == ["end"]
+        else:
+            pv.out_funcs = [ck]
+        if not pv.type:
+            pv.type = "linear"
+        return
+    fn = getattr(cls, ck, None)
+    if fn is None:
+        # Synthetic `start`
+        assert ck == "start"
+        cm = {}
+    else:
+        cm = get_meta(fn)
+    if FOREACH in cm:
+        foreach = cm[FOREACH]
+        in_step = foreach["prev"]
+        in_field = foreach["field"]
+        if in_step is None:
+            in_step = pk
+        pv = nodes[in_step]
+        assert pv.type is None
+        pv.type = "foreach"
+        pv.foreach_param = in_field
+        assert not pv.out_funcs
+        pv.out_funcs = [ck]
+        assert not cv.in_funcs
+        cv.in_funcs = {in_step}
+        cv.type = "linear"
+        return
+    if (
+        JOIN in cm
+    ):  # None is a valid/meaningful JOIN value ("join the immediately preceding foreach")
+        join = cm[JOIN]
+        assert cv.type is None
+        cv.type = "join"
+        if join is None:
+            pf = getattr(cls, pk)
+            if not pv.type:
+                pv.type = "linear"
+            assert not cv.in_funcs
+            cv.in_funcs = {pk}
+            assert not pv.out_funcs
+            pv.out_funcs = [ck]
+        else:
+            for pk in join:
+                pv = nodes[pk]
+                if not pv.type:
+                    pv.type = "linear"
+                cv.in_funcs.add(pk)
+                pv.out_funcs.append(ck)
+        return
+    if PREV_STEP in cm:
+        pk = cm[PREV_STEP] or pk
+        pv = nodes[pk]
+        if cv.in_funcs:
+            assert pk == "start"
+            assert cv.in_funcs == {"start"}
+        else:
+            cv.in_funcs = {pk}
+        if pk == "start":
+            assert pv.out_funcs == [ck]
+        elif pv.out_funcs:
+            pv.type = "split"
+            pv.out_funcs.append(ck)
+        else:
+            if not pv.type:
+                pv.type = "linear"
+            pv.out_funcs = [ck]
+        return
+    raise RuntimeError("Unrecognized node %s: %s" % (ck, str(cm)))
+
+
 class FlowSpecMeta(mf.FlowSpecMeta):
     """Metaclass that activates alternate graph-parsing for `FlowSpec`s
 
@@ -80,16 +291,18 @@ class FlowSpecMeta(mf.FlowSpecMeta):
         if all(not issubclass(base, mf.FlowSpec) for base in bases):
             bases = (mf.FlowSpec,) + bases
 
-        # TODO: would be nice to find a way to avoid defining the class twice (here and then again just before the end
-        # of this `__new__` function. `cls.mro()` may be redundant with `bases`, and various `getattr` method accesses
-        # could go through `dct`?
-        cls = super().__new__(sup, name, bases, dct)
-        file = cls.file
+        # Build a lightweight throwaway class (via `type.__new__`, bypassing `FlowSpecMeta.__new__`,
+        # which would construct a full `FlowGraph` and register parameters only for both to be
+        # discarded) to resolve the MRO and attribute lookups during parsing; the real class is
+        # created once, at the end, with the fully-assembled graph nodes.
+        cls = type.__new__(sup, name, bases, dct)
+        cls.file = file = infer_file(cls)
+        cls.name = name
 
         nodes, tree, root, end_lineno = parse_steps(cls)
 
         if nodes:
-            first_step = next(iter(nodes.keys()))
+            first_step = next(iter(nodes))
         else:
             first_step = "end"
 
@@ -102,9 +315,8 @@ class FlowSpecMeta(mf.FlowSpecMeta):
         if "start" not in nodes:
             # Build a synthetic `start` step
             # TODO: allow explicit/configurable start node
-            [start_tree] = ast.parse(
-                "def start(self): self.next(self.%s)" % first_step
-            ).body
+            start_tree = deepcopy(_START_STUB)
+            start_tree.body[0].value.args[0].attr = first_step
             start = DAGNode(start_tree, func=None, file=file, lineno=root.lineno)
             # must prepend `start`; order matters for graph-structure inference below
             nodes = {
@@ -114,121 +326,58 @@ class FlowSpecMeta(mf.FlowSpecMeta):
 
         if "end" not in nodes:
             # Build a synthetic `end` step
-            [end_tree] = ast.parse("def end(self): pass").body
-            end = DAGNode(end_tree, func=None, file=file, lineno=end_lineno)
+            # The end stub is never patched (unlike `start`), so all classes can share the frozen
+            # module-level AST; DAGNode doesn't mutate it and its lineno is overridden here.
+            end = DAGNode(_END_STUB, func=None, file=file, lineno=end_lineno)
             end.type = "end"
             nodes["end"] = end
 
-        def process(pk, pv, ck, cv):
-            if ck == "end":
-                if cv.type is None:
-                    cv.type = "end"
-                else:
-                    assert cv.type == "end"
-                cv.in_funcs = {pk}
-                if pv.out_funcs:
-                    assert pk == "start"
-                    assert pv.out_funcs == ["end"]
-                else:
-                    pv.out_funcs = [ck]
-                if not pv.type:
-                    pv.type = "linear"
-                return
-            fn = getattr(cls, ck, None)
-            if fn is None:
-                # Synthetic `start`
-                assert ck == "start"
-                cm = {}
-            else:
-                cm = get_meta(fn)
-            if FOREACH in cm:
-                foreach = cm[FOREACH]
-                in_step = foreach["prev"]
-                in_field = foreach["field"]
-                if in_step is None:
-                    in_step = pk
-                pv = nodes[in_step]
-                assert pv.type is None
-                pv.type = "foreach"
-                pv.foreach_param = in_field
-                assert not pv.out_funcs
-                pv.out_funcs = [ck]
-                assert not cv.in_funcs
-                cv.in_funcs = {in_step}
-                cv.type = "linear"
-                return
-            if (
-                JOIN in cm
-            ):  # None is a valid/meaningful JOIN value ("join the immediately preceding foreach")
-                join = cm[JOIN]
-                assert cv.type is None
-                cv.type = "join"
-                if join is None:
-                    pf = getattr(cls, pk)
-                    if not pv.type:
-                        pv.type = "linear"
-                    assert not cv.in_funcs
-                    cv.in_funcs = {pk}
-                    assert not pv.out_funcs
-                    pv.out_funcs = [ck]
-                else:
-                    for pk in join:
-                        pv = nodes[pk]
-                        if not pv.type:
-                            pv.type = "linear"
-                        cv.in_funcs.add(pk)
-                        pv.out_funcs.append(ck)
-                return
-            if PREV_STEP in cm:
-                pk = cm[PREV_STEP] or pk
-                pv = nodes[pk]
-                if cv.in_funcs:
-                    assert pk == "start"
-                    assert cv.in_funcs == {"start"}
-                else:
-                    cv.in_funcs = {pk}
-                if pk == "start":
-                    assert pv.out_funcs == [ck]
-                elif pv.out_funcs:
-                    pv.type = "split"
-                    pv.out_funcs.append(ck)
-                else:
-                    if not pv.type:
-                        pv.type = "linear"
-                    pv.out_funcs = [ck]
-                return
-            raise RuntimeError("Unrecognized node %s: %s" % (ck, str(cm)))
-
         items = list(nodes.items())
         for (pk, pv), (ck, cv) in zip(items, items[1:]):
-            process(pk, pv, ck, cv)
+            _process_pair(pk, pv, ck, cv, nodes, cls)
 
         # Rewrite step methods to include correct self.next calls
         # TODO: detect overloaded step names
         steps = {}
         parameters = {}
 
-        def expand(cur):
-            mro = cur.mro()
-            assert cur is mro[0]
-            bases = mro[1:]
-
-            for base in bases:
-                if issubclass(base, mf.FlowSpec) and not base is mf.FlowSpec:
-                    expand(base)
+        # Iterative DFS over the MRO, scanning each class's __dict__ once; classes are pushed back
+        # for scanning after their bases, preserving the bases-first order of the old recursive
+        # expand() without per-class Python call overhead.
+        expanded = set()
+        stack = [(cls, False)]
+        while stack:
+            cur, scan = stack.pop()
+            if not scan:
+                if cur in expanded:
+                    continue
+                expanded.add(cur)
+                stack.append((cur, True))
+                mro = cur.mro()
+                assert cur is mro[0]
+                # reversed so that, once these pop, bases are visited in MRO order
+                for base in reversed(mro[1:]):
+                    if (
+                        base not in expanded
+                        and issubclass(base, mf.FlowSpec)
+                        and not base is mf.FlowSpec
+                    ):
+                        stack.append((base, False))
+                continue
 
-            items = cur.__dict__.items()
-            file = getattr(cur, "file", None)
-            for k, v in items:
-                meta = getattr(v, META_KEY, {})
+            cur_file = getattr(cur, "file", None)
+            for k, v in cur.__dict__.items():
+                meta = getattr(v, META_KEY, None)
                 if callable(v) and (
-                    meta.get(IS_STEP, False) or getattr(v, IS_STEP, False)
+                    (meta is not None and meta.get(IS_STEP, False))
+                    or getattr(v, IS_STEP, False)
                 ):
-                    if meta.get("synthetic"):
-                        continue
-                    if not hasattr(v, META_KEY):
+                    if meta is None:
+                        meta = {}
                         setattr(v, META_KEY, meta)
-                    meta["file"] = file
+                    elif meta.get("synthetic"):
+                        continue
+                    meta["file"] = cur_file
                     if k in steps:
                         raise RuntimeError(
                             'Flow %s: refusing to mix in multiple implementations of step "%s"'
@@ -242,8 +391,6 @@ class FlowSpecMeta(mf.FlowSpecMeta):
                 elif isinstance(v, Parameter):
                     parameters[k] = v
 
-        expand(cls)
-
         for k, v in parameters.items():
             if k in dct:
                 if v is not dct[k]:
@@ -257,7 +404,7 @@ class FlowSpecMeta(mf.FlowSpecMeta):
         # TODO: unify this with the synthetic `start` AST above?
         if "start" not in steps:
             if steps:
-                first_step = next(iter(steps.keys()))
+                first_step = next(iter(steps))
                 start = lambda self: self.next(getattr(self, first_step))
             else:
                 start = lambda self: self.next(self.end)
@@ -295,44 +442,12 @@ class FlowSpecMeta(mf.FlowSpecMeta):
                 return fn
             meta = get_meta(fn)
             orig_fn = meta.get(ORIG_FN)
-            if node.type == "foreach":
-                [nxt] = node.out_funcs
-                field = node.foreach_param
-                next_fn = lambda self: self.next(getattr(self, nxt), foreach=field)
-            elif node.type == "split":
-                out_funcs = node.out_funcs
-                assert len(out_funcs) > 1
-                next_fn = lambda self: self.next(
-                    *[getattr(self, nxt) for nxt in out_funcs]
-                )
-            elif node.type == "join":
-                out_funcs = node.out_funcs
-                if len(out_funcs) == 1:
-                    [nxt] = node.out_funcs
-                    next_fn = lambda self: self.next(getattr(self, nxt))
-                else:
-                    next_fn = lambda self: self.next(
-                        *[getattr(self, nxt) for nxt in out_funcs]
-                    )
-            elif node.type == "linear":
-                if len(node.out_funcs) == 1:
-                    [nxt] = node.out_funcs
-                else:
-                    raise RuntimeError(
-                        "node %s: expected 1 out_func, found %d%s"
-                        % (
-                            name,
-                            len(node.out_funcs),
-                            (" %s" % ",".join(node.out_funcs))
-                            if node.out_funcs
-                            else "",
-                        )
-                    )
-                next_fn = lambda self: self.next(getattr(self, nxt))
-            else:
+            build_next = _NEXT_FN_BUILDERS.get(node.type)
+            if build_next is None:
                 raise RuntimeError(
                     "node %s: unexpected node.type %s" % (name, node.type)
                 )
+            next_fn = build_next(name, node)
             if not orig_fn:
                 orig_fn = fn
             if node.type == "join":
@@ -366,13 +481,10 @@ class FlowSpecMeta(mf.FlowSpecMeta):
             assert meta[IS_STEP]
             return mf.step(fn2)
 
-        # Replace each step fn with a wrapped fn that includes a trailing `self.next` call to the next step
-        steps = list(steps.items())
-        steps = {name: wrap_step(name, nodes[name], fn) for name, fn in steps}
-
-        # Insert wrapped functions into class-methods dictionary
-        for k, v in steps.items():
-            dct[k] = steps[k]
+        # Replace each step fn with a wrapped fn that includes a trailing `self.next` call to the
+        # next step, inserting it into the class-methods dictionary in the same pass
+        for k, fn in steps.items():
+            dct[k] = wrap_step(k, nodes[k], fn)
 
         # Recreate the FlowSpec class with new methods and augmented graph nodes
         cls = super().__new__(sup, name, bases, dct, nodes=nodes)
@@ -2,12 +2,15 @@ import sys
 
 import os
 
-from metaflow import FlowSpec
 from metaflow._vendor import click
 
-from metaflow.extension_support.cmd import process_cmds, resolve_cmds
-from metaflow.plugins.datastores.local_storage import LocalStorage
-from metaflow.metaflow_config import DATASTORE_LOCAL_DIR
+from metaflow.extension_support.cmd import (
+    discard_cached_cmds,
+    load_cached_cmds,
+    process_cmds,
+    resolve_cmds,
+    save_cmd_cache,
+)
 
 from .util import echo_always
 
@@ -42,6 +45,8 @@ def status():
         return
 
     from metaflow.client import namespace, metadata, Metaflow
+    from metaflow.metaflow_config import DATASTORE_LOCAL_DIR
+    from metaflow.plugins.datastores.local_storage import LocalStorage
 
     # Get the local data store path
     path = LocalStorage.get_datastore_root_from_config(echo, create_on_absent=False)
@@ -72,18 +77,41 @@ def status():
 @click.argument("flow_path")
 @click.argument("extra_args", nargs=-1, type=click.UNPROCESSED)
 def flow(flow_path, extra_args):
-    flow_spec = FlowSpec.load(flow_path)
+    # Import here (rather than at module level) so that `metaflow help`/`status` and friends don't
+    # pay flow-machinery import cost at CLI startup
+    from metaflow import FlowSpec
+
+    # The CLI argv names exactly the flow to run, so overwrite any previously-registered
+    # main flow; this is a no-op for one-shot CLI processes but lets a long-lived process
+    # (e.g. the test harness' CLI worker) serve several flows in sequence
+    flow_spec = FlowSpec.load(flow_path, register_main="overwrite")
     flow_spec(args=extra_args)
 
 
 CMDS_DESC = [("configure", ".configure_cmd.cli"), ("tutorials", ".tutorials_cmd.cli")]
 
-process_cmds(globals())
+# Subcommand resolution walks every installed extension module; short-circuit it with the on-disk
+# cache when this environment has been scanned before, falling back to a full scan if the cached
+# entries no longer resolve.
+_cmds = None
+if load_cached_cmds():
+    try:
+        _cmds = resolve_cmds()
+    except ValueError:
+        # Stale cache: drop the loaded state before rebuilding, or `process_cmds` would
+        # honor the stale ENABLED_CMD / registry entries and fail the same way
+        discard_cached_cmds()
+        _cmds = None
+if _cmds is None:
+    process_cmds(globals())
+    _cmds = resolve_cmds()
+    # Only persist state that has been proven to resolve
+    save_cmd_cache()
 
 
 @click.command(
     cls=click.CommandCollection,
-    sources=[main] + resolve_cmds(),
+    sources=[main] + _cmds,
     invoke_without_command=True,
 )
 @click.pass_context
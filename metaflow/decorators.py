@@ -553,7 +553,10 @@ def step(f):
     """
     The step decorator. Makes a method a step in the workflow.
     """
-    setattr(f, IS_STEP, True)
+    # `metaflow.api` decorators route through here too (and may stack, each application passing `f`
+    # back in); skip attribute writes a previous application already made.
+    if not getattr(f, IS_STEP, False):
+        setattr(f, IS_STEP, True)
     if not hasattr(f, "decorators"):
         f.decorators = []
     try:
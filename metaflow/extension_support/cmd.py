@@ -1,4 +1,8 @@
+import hashlib
 import importlib
+import json
+import os
+import sys
 import traceback
 
 from metaflow.metaflow_config_funcs import from_conf
@@ -12,6 +16,78 @@ _all_cmds_dict = {}
 ENABLED_CMD = from_conf("ENABLED_CMD")
 _TOGGLE_CMD = []
 
+# ENABLED_CMD is rewritten by `process_cmds`; the cache key below must use the raw configured value
+# so that hits and misses are computed consistently before and after processing
+_CONFIGURED_ENABLED_CMD = ENABLED_CMD
+
+# Resolved-command cache: `process_cmds` walks all installed extension modules, which is
+# O(installed packages) and re-done at every interpreter start. The resulting
+# {name: class_path} dict is tiny and stable for a given environment, so it's persisted here, keyed
+# by interpreter prefix + sys.path entries (and their mtimes) + the configured ENABLED_CMD value.
+_CMD_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".metaflow", "cmd_cache.json")
+
+
+def _cmd_cache_key():
+    # Include each sys.path entry's mtime: installing or removing a package touches its
+    # site-packages directory, so new extension commands invalidate the cache
+    paths = []
+    for p in sorted(set(sys.path)):
+        try:
+            paths.append("%s:%d" % (p, os.stat(p).st_mtime_ns))
+        except OSError:
+            paths.append(p)
+    return hashlib.blake2b(
+        ("%s|%s|%s" % (sys.prefix, paths, _CONFIGURED_ENABLED_CMD)).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+
+
+def load_cached_cmds():
+    """Populate the command registry from the on-disk cache; returns False on miss/mismatch."""
+    global ENABLED_CMD, _all_cmds_dict
+    try:
+        with open(_CMD_CACHE_FILE) as f:
+            cache = json.load(f)
+        if cache.get("key") != _cmd_cache_key():
+            return False
+        _all_cmds_dict.update(cache["cmds"])
+        ENABLED_CMD = cache["enabled"]
+        return True
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def discard_cached_cmds():
+    """Restore the pristine (pre-`load_cached_cmds`) command state
+
+    Called when cached commands no longer resolve. `process_cmds` only computes
+    ENABLED_CMD when it is None and never removes registry entries, so the stale values
+    loaded from the cache must be dropped before the fallback rebuild or it would fail
+    the same way."""
+    global ENABLED_CMD, _all_cmds
+    _all_cmds = []
+    _all_cmds_dict.clear()
+    del _TOGGLE_CMD[:]
+    ENABLED_CMD = _CONFIGURED_ENABLED_CMD
+
+
+def save_cmd_cache():
+    """Persist the command registry populated by `process_cmds` (best-effort)."""
+    try:
+        os.makedirs(os.path.dirname(_CMD_CACHE_FILE), exist_ok=True)
+        with open(_CMD_CACHE_FILE, "w") as f:
+            json.dump(
+                {
+                    "key": _cmd_cache_key(),
+                    "cmds": _all_cmds_dict,
+                    "enabled": ENABLED_CMD,
+                },
+                f,
+            )
+    except OSError:
+        pass
+
+
 # This file is identical in functionality to the plugins.py file. Please refer to that
 # one for more information on what the functions do.
 
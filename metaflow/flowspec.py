@@ -4,10 +4,9 @@ import os
 from os import getcwd, listdir
 from os.path import exists
 import sys
-import traceback
 
 from itertools import islice
-from types import FunctionType, MethodType
+from types import FunctionType, MappingProxyType, MethodType
 from typing import Any, Callable, List, Optional, Tuple
 
 import metaflow
@@ -39,13 +38,50 @@ except NameError:
 from .datastore.inputs import Inputs
 
 
+# `FlowSpec.load` cache: (abspath, st_mtime_ns, st_size) → (exec'd module context, resolved default
+# flow name or None). Re-reading/re-exec'ing an unchanged source file is pure repeated work, and the
+# cached classes are safe to share because flow classes are immutable after definition. Set
+# METAFLOW_DISABLE_LOAD_CACHE to bypass.
+_LOAD_CACHE = {}
+
+# Sentinel distinguishing "not cached yet" from a cached `None` input in `_cached_input`
+_UNSET = object()
+
+# Shared read-only default for `FlowSpec.cmd`; `cmd_with_io.cmd` only iterates its inputs, so a
+# single immutable empty mapping avoids an allocation per call
+_EMPTY_INPUT = MappingProxyType({})
+
+# Lazily-resolved `metaflow.decorators.flow_decorators`; that module imports this one, so the
+# import has to be deferred, but it only needs to happen once per process
+_flow_decorators_fn = None
+
+
+def _flow_decorator_info():
+    """Summaries of attached flow-level decorators, as recorded in `_graph_info`"""
+    global _flow_decorators_fn
+    if _flow_decorators_fn is None:
+        from metaflow.decorators import flow_decorators
+
+        _flow_decorators_fn = flow_decorators
+    return [
+        {
+            "name": deco.name,
+            "attributes": deco.attributes,
+            "statically_defined": deco.statically_defined,
+        }
+        for deco in _flow_decorators_fn()
+        if not deco.name.startswith("_")
+    ]
+
+
 class InvalidNextException(MetaflowException):
     headline = "Invalid self.next() transition detected"
 
     def __init__(self, msg):
         # NOTE this assume that InvalidNextException is only raised
-        # at the top level of next()
-        _, line_no, _, _ = traceback.extract_stack()[-3]
+        # at the top level of next(); grab the caller's line number directly
+        # instead of extracting (and formatting) the whole stack
+        line_no = sys._getframe(2).f_lineno
         super(InvalidNextException, self).__init__(msg, line_no)
 
 
@@ -117,9 +153,44 @@ class FlowSpecMeta(type):
         cls.file = file
         cls.name = name
         cls.path_spec = "%s:%s" % (cls.file, cls.name)
+        # Legacy accessor; fixed per class, so computed here rather than per read
+        cls.script_name = os.path.basename(file[:-1] if file.endswith(".pyc") else file)
 
         cls._graph = FlowGraph(cls, nodes=nodes)
-        cls._steps = [getattr(cls, node.name) for node in cls._graph]
+        cls._steps = tuple(getattr(cls, node.name) for node in cls._graph)
+        cls._step_names = frozenset(node.name for node in cls._graph)
+
+        # Parameters and plain class-level constants are fixed once the class body has executed;
+        # scan `dir(cls)` once here so neither `_get_parameters` nor `_set_constants` re-walks it
+        # on every call
+        params = []
+        constants = []
+        for var in dir(cls):
+            if var[0] == "_" or var in cls._NON_PARAMETERS:
+                continue
+            try:
+                val = getattr(cls, var)
+            except:
+                continue
+            if isinstance(val, Parameter):
+                params.append((var, val))
+            elif not isinstance(val, (MethodType, FunctionType, property, type)):
+                constants.append((var, val))
+        cls._parameters = tuple(params)
+        cls._flow_constants = tuple(constants)
+
+        # Duplicate Parameter names are a static property of the class; fail here, at
+        # definition time, rather than re-checking on every run
+        seen_names = set()
+        for _, param in params:
+            norm = param.name.lower()
+            if norm in seen_names:
+                raise MetaflowException(
+                    "Parameter *%s* is specified twice. "
+                    "Note that parameter names are "
+                    "case-insensitive." % param.name
+                )
+            seen_names.add(norm)
 
         # Register this flow with global parameter-parsing machinery
         register_parameters(cls)
@@ -145,14 +216,19 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
         "_NON_PARAMETERS",
         "_datastore",
         "_cached_input",
+        "_materialized_input",
         "_graph",
+        "_flow_constants",
         "_flow_decorators",
+        "_parameters",
+        "_step_names",
         "_steps",
         "index",
         "input",
         "name",
         "file",
         "path_spec",
+        "script_name",
     }
     # When checking for parameters, we look at dir(self) but we want to exclude
     # attributes that are definitely not parameters and may be expensive to
@@ -162,6 +238,13 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
 
     _flow_decorators = {}
 
+    # (var, Parameter) and (var, constant) pairs; overwritten per-class by the metaclass
+    _parameters = ()
+    _flow_constants = ()
+
+    # Step names from the graph; overwritten per-class by the metaclass
+    _step_names = frozenset()
+
     def __init__(self, use_cli=True, args=None, entrypoint=None, standalone_mode=True):
         """
         Construct a FlowSpec
@@ -176,7 +259,8 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
 
         self._datastore = None
         self._transition = None
-        self._cached_input = {}
+        self._cached_input = []
+        self._materialized_input = {}
 
         if use_cli:
             if (
@@ -238,13 +322,9 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
         elif len(args) == 1:
             path_spec = args[0]
             if isinstance(path_spec, str):
-                pcs = path_spec.rsplit(":", 1)
-                if len(pcs) == 2:
-                    file, name = pcs
-                elif len(pcs) == 1:
-                    file, name = pcs[0], None
-                else:
-                    raise ValueError("Invalid Flow path-spec: %s" % path_spec)
+                file, sep, name = path_spec.rpartition(":")
+                if not sep:
+                    file, name = name, None
             else:
                 raise ValueError(
                     "Single argument should be (string) Flow path-spec in the form: <file>:<name>; found %s (%s)"
@@ -260,19 +340,38 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
             raise ValueError(
                 "File %s not found in %s (contents: %s)" % (file, getcwd(), listdir())
             )
-        with open(file, "r") as f:
-            src = f.read()
 
-        ctx = dict(
-            __file__=file,
-            __name__="__main__",
-        )
-        with flowspec_load_ctx(file):
-            exec(src, ctx)
+        key = cached = None
+        if not os.environ.get("METAFLOW_DISABLE_LOAD_CACHE"):
+            st = os.stat(file)
+            key = (os.path.abspath(file), st.st_mtime_ns, st.st_size)
+            cached = _LOAD_CACHE.get(key)
+
+        if cached is not None:
+            ctx, default_name = cached
+        else:
+            with open(file, "r") as f:
+                src = f.read()
+
+            ctx = dict(
+                __file__=file,
+                __name__="__main__",
+            )
+            with flowspec_load_ctx(file):
+                exec(src, ctx)
+
+            default_name = None
+            if key is not None:
+                _LOAD_CACHE[key] = (ctx, default_name)
 
         if name is None:
-            flow_ast, tree = parse_flow(file)
-            name = flow_ast.name
+            name = default_name
+            if name is None:
+                flow_ast, tree = parse_flow(file)
+                name = flow_ast.name
+                if key is not None:
+                    # Remember the resolved name so later default loads skip the AST walk too
+                    _LOAD_CACHE[key] = (ctx, name)
 
         flow_spec = ctx[name]
 
@@ -281,48 +380,23 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
 
         return flow_spec
 
-    @property
-    def script_name(self) -> str:
-        """
-        [Legacy function - do not use. Use `current` instead]
-
-        Returns the name of the script containing the flow
-
-        Returns
-        -------
-        str
-            A string containing the name of the script
-        """
-        fname = self.file
-        if fname.endswith(".pyc"):
-            fname = fname[:-1]
-        return os.path.basename(fname)
+    # `script_name` ([Legacy - do not use. Use `current` instead]) is the name of the script
+    # containing the flow; it is fixed per class and set by the metaclass
+    script_name: Optional[str] = None
 
     def _set_constants(self, graph, kwargs):
-        from metaflow.decorators import (
-            flow_decorators,
-        )  # To prevent circular dependency
-
         # Persist values for parameters and other constants (class level variables)
         # only once. This method is called before persist_constants is called to
         # persist all values set using setattr
-        seen = set()
-        for var, param in self._get_parameters():
-            norm = param.name.lower()
-            if norm in seen:
-                raise MetaflowException(
-                    "Parameter *%s* is specified twice. "
-                    "Note that parameter names are "
-                    "case-insensitive." % param.name
-                )
-            seen.add(norm)
-        seen.clear()
         self._success = True
 
+        # Duplicate parameter names are rejected at class-definition time (see
+        # `FlowSpecMeta.__new__`), so a single assignment pass suffices here
+        seen = set()
         parameters_info = []
         for var, param in self._get_parameters():
             seen.add(var)
-            val = kwargs[param.name.replace("-", "_").lower()]
+            val = kwargs[param._kwarg_key]
             # Support for delayed evaluation of parameters.
             if isinstance(val, DelayedEvaluationParameter):
                 val = val()
@@ -334,11 +408,8 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
         # to them don't propagate well since we create a new process for each step and
         # re-read the flow file
         constants_info = []
-        for var in dir(self.__class__):
-            if var[0] == "_" or var in self._NON_PARAMETERS or var in seen:
-                continue
-            val = getattr(self.__class__, var)
-            if isinstance(val, (MethodType, FunctionType, property, type)):
+        for var, val in self._flow_constants:
+            if var in seen:
                 continue
             constants_info.append({"name": var, "type": type(val).__name__})
             setattr(self, var, val)
@@ -353,29 +424,14 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
             "steps": steps_info,
             "graph_structure": graph_structure,
             "doc": graph.doc,
-            "decorators": [
-                {
-                    "name": deco.name,
-                    "attributes": deco.attributes,
-                    "statically_defined": deco.statically_defined,
-                }
-                for deco in flow_decorators()
-                if not deco.name.startswith("_")
-            ],
+            "decorators": _flow_decorator_info(),
         }
         self._graph_info = graph_info
 
     @classmethod
     def _get_parameters(cls):
-        for var in dir(cls):
-            if var[0] == "_" or var in cls._NON_PARAMETERS:
-                continue
-            try:
-                val = getattr(cls, var)
-            except:
-                continue
-            if isinstance(val, Parameter):
-                yield var, val
+        # `_parameters` is precomputed by the metaclass; see `FlowSpecMeta.__new__`
+        return iter(cls._parameters)
 
     def _set_datastore(self, datastore):
         self._datastore = datastore
@@ -394,9 +450,14 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
         return iter(self._steps)
 
     def __getattr__(self, name: str):
-        if self._datastore and name in self._datastore:
+        if name[:2] == "__":
+            # Dunder probes (pickle, copy, IPython, ...) are frequent and are never
+            # datastore artifacts; fail fast without formatting a message
+            raise AttributeError(name)
+        ds = self.__dict__.get("_datastore")
+        if ds and name in ds:
             # load the attribute from the datastore...
-            x = self._datastore[name]
+            x = ds[name]
             # ...and cache it in the object for faster access
             setattr(self, name, x)
             return x
@@ -407,7 +468,9 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
         """
         [Legacy function - do not use]
         """
-        return cmd_with_io.cmd(cmdline, input=input or {}, output=output or [])
+        return cmd_with_io.cmd(
+            cmdline, input=input or _EMPTY_INPUT, output=output or ()
+        )
 
     @property
     def index(self) -> Optional[int]:
@@ -501,36 +564,53 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
         ]
 
     def _find_input(self, stack_index=None):
+        stack = self._foreach_stack
+        if not stack:
+            return None
         if stack_index is None:
-            stack_index = len(self._foreach_stack) - 1
-
-        if stack_index in self._cached_input:
-            return self._cached_input[stack_index]
-        elif self._foreach_stack:
-            # NOTE this is obviously an O(n) operation which also requires
-            # downloading the whole input data object in order to find the
-            # right split. One can override this method with a more efficient
-            # input data handler if this is a problem.
-            frame = self._foreach_stack[stack_index]
+            stack_index = len(stack) - 1
+
+        # `_cached_input` is a dense list indexed by stack depth; grow it lazily so
+        # lookups are plain list indexing rather than dict hashing
+        cached = self._cached_input
+        if len(cached) < len(stack):
+            cached.extend([_UNSET] * (len(stack) - len(cached)))
+        val = cached[stack_index]
+        if val is not _UNSET:
+            return val
+
+        # NOTE this is obviously an O(n) operation which also requires
+        # downloading the whole input data object in order to find the
+        # right split. One can override this method with a more efficient
+        # input data handler if this is a problem.
+        frame = stack[stack_index]
+        try:
+            var = getattr(self, frame.var)
+        except AttributeError:
+            # this is where AttributeError happens:
+            # [ foreach x ]
+            #   [ foreach y ]
+            #     [ inner ]
+            #   [ join y ] <- call self.foreach_stack here,
+            #                 self.x is not available
+            val = None
+        else:
             try:
-                var = getattr(self, frame.var)
-            except AttributeError:
-                # this is where AttributeError happens:
-                # [ foreach x ]
-                #   [ foreach y ]
-                #     [ inner ]
-                #   [ join y ] <- call self.foreach_stack here,
-                #                 self.x is not available
-                self._cached_input[stack_index] = None
-            else:
-                try:
-                    self._cached_input[stack_index] = var[frame.index]
-                except TypeError:
-                    # __getitem__ not supported, fall back to an iterator
-                    self._cached_input[stack_index] = next(
-                        islice(var, frame.index, frame.index + 1)
-                    )
-            return self._cached_input[stack_index]
+                val = var[frame.index]
+            except TypeError:
+                # __getitem__ not supported; materialize the iterable once (keyed by the
+                # foreach var, shared by all stack levels over it) so repeated lookups don't
+                # re-walk it O(index) each time — unless it's suspiciously large, in which
+                # case fall back to a one-off iterator walk
+                if frame.num_splits is not None and frame.num_splits <= 10000:
+                    values = self._materialized_input.get(frame.var)
+                    if values is None:
+                        values = self._materialized_input[frame.var] = list(var)
+                    val = values[frame.index]
+                else:
+                    val = next(islice(var, frame.index, frame.index + 1))
+        cached[stack_index] = val
+        return val
 
     def merge_artifacts(
         self,
@@ -589,8 +669,8 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
             This exception is thrown in case an artifact specified in `include` cannot
             be found.
         """
-        include = include or []
-        exclude = exclude or []
+        include = frozenset(include or ())
+        exclude = frozenset(exclude or ())
         node = self._graph[self._current_step]
         if node.type != "join":
             msg = (
@@ -598,35 +678,47 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
                 "is not a join".format(step=self._current_step)
             )
             raise MetaflowException(msg)
-        if len(exclude) > 0 and len(include) > 0:
+        if exclude and include:
             msg = "`exclude` and `include` are mutually exclusive in merge_artifacts"
             raise MetaflowException(msg)
 
         to_merge = {}
         unresolved = []
+        cls = self.__class__
+        self_vars = self.__dict__
+        ds = self._datastore
         for inp in inputs:
-            # available_vars is the list of variables from inp that should be considered
-            if include:
-                available_vars = (
-                    (var, sha)
-                    for var, sha in inp._datastore.items()
-                    if (var in include) and (not hasattr(self, var))
-                )
-            else:
-                available_vars = (
-                    (var, sha)
-                    for var, sha in inp._datastore.items()
-                    if (var not in exclude) and (not hasattr(self, var))
-                )
-            for var, sha in available_vars:
-                _, previous_sha = to_merge.setdefault(var, (inp, sha))
-                if previous_sha != sha:
+            for var, sha in inp._datastore.items():
+                # Only consider variables from inp selected by include/exclude
+                if include:
+                    if var not in include:
+                        continue
+                elif var in exclude:
+                    continue
+                # Equivalent to `hasattr(self, var)`, but without the exception machinery
+                # on misses and without `__getattr__` loading the artifact on hits just so
+                # we can skip it
+                if (
+                    var in self_vars
+                    or hasattr(cls, var)
+                    or (ds is not None and var in ds)
+                ):
+                    continue
+                previous = to_merge.get(var)
+                if previous is None:
+                    to_merge[var] = (inp, sha)
+                elif previous[1] != sha:
                     # We have a conflict here
                     unresolved.append(var)
         # Check if everything in include is present in to_merge
         missing = []
         for v in include:
-            if v not in to_merge and not hasattr(self, v):
+            if (
+                v not in to_merge
+                and v not in self_vars
+                and not hasattr(cls, v)
+                and not (ds is not None and v in ds)
+            ):
                 missing.append(v)
         if unresolved:
             # We have unresolved conflicts, so we do not set anything and error out
@@ -731,17 +823,18 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
 
         # check: all destinations are methods of this object
         funcs = []
+        step_names = self._step_names
         for i, dst in enumerate(dsts):
-            try:
-                name = dst.__func__.__name__
-            except:
+            func = getattr(dst, "__func__", None)
+            if func is None:
                 msg = (
                     "In step *{step}* the {arg}. argument in self.next() is "
                     "not a function. Make sure all arguments in self.next() "
                     "are methods of the Flow class.".format(step=step, arg=i + 1)
                 )
                 raise InvalidNextException(msg)
-            if not hasattr(self, name):
+            name = func.__name__
+            if name not in step_names:
                 msg = (
                     "Step *{step}* specifies a self.next() transition to an "
                     "unknown step, *{name}*.".format(step=step, name=name)
@@ -790,15 +883,20 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
                 self._validate_ubf_step(funcs[0])
             else:
                 try:
-                    self._foreach_num_splits = sum(1 for _ in foreach_iter)
+                    # O(1) for sized containers (the common case), and doesn't
+                    # exhaust the iterable
+                    self._foreach_num_splits = len(foreach_iter)
                 except TypeError:
-                    msg = (
-                        "Foreach variable *self.{var}* in step *{step}* "
-                        "is not iterable. Check your variable.".format(
-                            step=step, var=foreach
+                    try:
+                        self._foreach_num_splits = sum(1 for _ in foreach_iter)
+                    except TypeError:
+                        msg = (
+                            "Foreach variable *self.{var}* in step *{step}* "
+                            "is not iterable. Check your variable.".format(
+                                step=step, var=foreach
+                            )
                         )
-                    )
-                    raise InvalidNextException(msg)
+                        raise InvalidNextException(msg)
 
                 if self._foreach_num_splits == 0:
                     msg = (
@@ -826,9 +924,16 @@ class FlowSpec(object, metaclass=FlowSpecMeta):
     def __str__(self):
         step_name = getattr(self, "_current_step", None)
         if step_name:
-            index = ",".join(str(idx) for idx, _, _ in self.foreach_stack())
+            # Only the indices are needed here; don't call `foreach_stack()`, which
+            # fetches the input value for every frame just to discard it
+            stack = getattr(self, "_foreach_stack", None) or ()
+            index = ",".join(str(frame.index) for frame in stack)
             if index:
-                inp = self.input
+                try:
+                    inp = self.input
+                except Exception:
+                    # never let input fetching poison logging/repr paths
+                    inp = None
                 if inp is None:
                     return "<flow %s step %s[%s]>" % (self.name, step_name, index)
                 else:
@@ -1,5 +1,6 @@
 import inspect
 import ast
+import os
 import re
 
 from metaflow.meta import IS_STEP, META_KEY
@@ -174,18 +175,16 @@ class DAGNode(object):
         )
 
 
-def parse_flow(file, name=None):
-    """Parse a FlowSpec's AST from a file
+def find_root(tree, file, name=None):
+    """Find a FlowSpec's ClassDef in a parsed module body
 
-    The FlowSpec must be the only top-level class found in `source` (or the only one matching `name`, if provided)
+    The FlowSpec must be the only top-level class found in `tree` (or the only one matching `name`, if provided)
 
-    :param file: path to load a FlowSpec's AST from
+    :param tree: parsed module body (list of top-level AST nodes)
+    :param file: path `tree` was parsed from (used in error messages)
     :param name: optional class-name to load (required if multiple top-level classes exist in `file`)
-    :return: (FlowSpec ClassDef AST, full `source` AST)
+    :return: FlowSpec ClassDef AST
     """
-    with open(file, "r") as f:
-        source = f.read()
-    tree = ast.parse(source).body
     roots = [
         n
         for n in tree
@@ -203,8 +202,35 @@ def parse_flow(file, name=None):
             raise RuntimeError(
                 "%d roots found named %s in %s" % (len(roots), name, file)
             )
-    root = roots[0]
-    return root, tree
+    return roots[0]
+
+
+# Parsed-module cache for `parse_flow`: every FlowGraph construction re-reads and re-parses the
+# flow's source, and the parse dominates that cost. The tree only depends on the file's content,
+# so cache it per path and invalidate when the file's mtime or size changes.
+_parse_cache = {}
+
+
+def parse_flow(file, name=None):
+    """Parse a FlowSpec's AST from a file
+
+    The FlowSpec must be the only top-level class found in `source` (or the only one matching `name`, if provided)
+
+    :param file: path to load a FlowSpec's AST from
+    :param name: optional class-name to load (required if multiple top-level classes exist in `file`)
+    :return: (FlowSpec ClassDef AST, full `source` AST)
+    """
+    st = os.stat(file)
+    stat_key = (st.st_mtime_ns, st.st_size)
+    cached = _parse_cache.get(file)
+    if cached is not None and cached[0] == stat_key:
+        tree = cached[1]
+    else:
+        with open(file, "r") as f:
+            source = f.read()
+        tree = ast.parse(source).body
+        _parse_cache[file] = (stat_key, tree)
+    return find_root(tree, file, name), tree
 
 
 class StepVisitor(ast.NodeVisitor):
@@ -1,4 +1,6 @@
+import inspect
 import json
+import weakref
 from typing import Any, Callable, Dict, NamedTuple, Optional, Type, Union
 
 from metaflow._vendor import click
@@ -31,8 +33,14 @@ ParameterContext = NamedTuple(
     ],
 )
 
-# Global FlowSpec → List[Parameters] registry; initial value `None` indicates uninitialized state
-_parameters: Union[None, dict] = None
+# Type names shown in `DeployTimeField._check_type` error messages
+# note: this doesn't work with long in Python2 or types defined as
+# click types, e.g. click.INT
+_DEPLOYTIME_TYPE_NAMES = {bool: "bool", int: "int", float: "float", list: "list"}
+
+# Global FlowSpec → List[Parameters] registry; initial value `None` indicates uninitialized state.
+# Keys are held weakly so dynamically-generated flow classes (common in tests) can be GC'd.
+_parameters: Union[None, "weakref.WeakKeyDictionary"] = None
 context_proto = None
 
 
@@ -68,6 +76,19 @@ def register_main_flow(flow, overwrite=False):
             add_custom_cmd_parameters(cmd)
 
 
+def _params_list(flow):
+    """Materialized (var, Parameter) pairs for a flow class or instance
+
+    The metaclass precomputes `cls._parameters` once at class construction; reuse that
+    tuple directly rather than re-materializing it at every call site. The
+    `_get_parameters` fallback covers classes built without the metaclass."""
+    cls = flow if isinstance(flow, type) else type(flow)
+    params = cls.__dict__.get("_parameters")
+    if params is not None:
+        return params
+    return tuple(cls._get_parameters())
+
+
 def register_parameters(flow):
     """Register a flow class's Parameters with the global `_parameters` dict
 
@@ -75,13 +96,21 @@ def register_parameters(flow):
     if not isinstance(flow, type):
         raise ValueError("Expected a FlowSpec class: %s" % str(flow))
 
-    params = dict(flow._get_parameters())
-
     global _parameters
     if _parameters is None:
-        _parameters = {}
-    if flow not in _parameters:
-        _parameters[flow] = params
+        _parameters = weakref.WeakKeyDictionary()
+    if flow in _parameters:
+        return
+    # `_params_list` returns pairs precomputed on the class; store them as-is,
+    # preserving declaration order for `add_custom_cmd_parameters`
+    try:
+        _parameters[flow] = _params_list(flow)
+    except TypeError:
+        # Non-weakrefable class (shouldn't happen for metaclass-built FlowSpecs); fall
+        # back to a strong reference
+        if type(_parameters) is not dict:
+            _parameters = dict(_parameters)
+        _parameters[flow] = _params_list(flow)
 
 
 def clear_main_flow(empty_ok=False):
@@ -97,12 +126,12 @@ def clear_main_flow(empty_ok=False):
     _flow = None
     for cmd, v in _param_opts.items():
         param_opts = v["opts"]
-        while param_opts:
-            param = param_opts.pop(0)
-            cmd_param = cmd.params[0]
-            if param is cmd_param:
-                cmd.params.pop(0)
-            else:
+        # Our options were inserted as a prefix of cmd.params; verify identity in one
+        # pass and splice the prefix off in one operation instead of popping the front
+        # (O(n) shift) once per option
+        for i, param in enumerate(param_opts):
+            cmd_param = cmd.params[i]
+            if param is not cmd_param:
                 raise RuntimeError(
                     "Attempting to remove parameter-option %s from cmd %s, found %s instead"
                     % (
@@ -111,6 +140,8 @@ def clear_main_flow(empty_ok=False):
                         cmd_param.name,
                     )
                 )
+        del cmd.params[: len(param_opts)]
+        param_opts.clear()
 
 
 def has_main_flow():
@@ -126,7 +157,7 @@ class JSONTypeClass(click.ParamType):
             return value
         try:
             return json.loads(value)
-        except:
+        except json.JSONDecodeError:
             self.fail("%s is not a valid JSON object" % value, param, ctx)
 
     def __str__(self):
@@ -156,8 +187,30 @@ class DeployTimeField(object):
         print_representation=None,
     ):
         self.fun = fun
+        # Decide up front whether `fun` accepts the deploy_time argument, instead of
+        # probing with a caught TypeError on every call (which would also silently
+        # retry a TypeError raised *inside* fun)
+        self._pass_deploy_time = True
+        self._arity_known = True
+        try:
+            sig = inspect.signature(fun)
+        except (TypeError, ValueError):
+            # Uninspectable callable; assume the 2-argument form and let __call__
+            # fall back (once) if that proves wrong
+            self._arity_known = False
+        else:
+            try:
+                sig.bind(None, False)
+            except TypeError:
+                self._pass_deploy_time = False
         self.field = field
         self.parameter_name = parameter_name
+        # (context_proto, derived ParameterContext) pair; `set_parameter_context`
+        # rebinds `context_proto`, so identity comparison suffices for invalidation
+        self._ctx_cache = (None, None)
+        # (context_proto, rendered value) pair for __str__/__repr__, which click may
+        # invoke repeatedly while rendering help text
+        self._str_cache = (None, None)
         self.parameter_type = parameter_type
         self.return_str = return_str
         self.print_representation = (
@@ -182,14 +235,26 @@ class DeployTimeField(object):
         #    this scenario, the value should be something that can be converted to JSON.
         # The deploy_time value can therefore be used to determine which type of
         # processing is requested.
-        ctx = context_proto._replace(parameter_name=self.parameter_name)
+        proto = context_proto
+        cached_proto, ctx = self._ctx_cache
+        if cached_proto is not proto:
+            ctx = proto._replace(parameter_name=self.parameter_name)
+            self._ctx_cache = (proto, ctx)
         try:
-            try:
-                # Most user-level functions may not care about the deploy_time parameter
-                # but IncludeFile does.
-                val = self.fun(ctx, deploy_time)
-            except TypeError:
+            # Most user-level functions may not care about the deploy_time parameter
+            # but IncludeFile does.
+            if not self._pass_deploy_time:
                 val = self.fun(ctx)
+            elif self._arity_known:
+                val = self.fun(ctx, deploy_time)
+            else:
+                # Arity couldn't be determined in __init__; probe once and remember
+                try:
+                    val = self.fun(ctx, deploy_time)
+                except TypeError:
+                    self._pass_deploy_time = False
+                    self._arity_known = True
+                    val = self.fun(ctx)
         except:
             raise ParameterFieldFailed(self.parameter_name, self.field)
         else:
@@ -201,19 +266,15 @@ class DeployTimeField(object):
         # in Parameter. Let's catch those mistakes early here, instead of
         # showing a cryptic stack trace later.
 
-        # note: this doesn't work with long in Python2 or types defined as
-        # click types, e.g. click.INT
-        TYPES = {bool: "bool", int: "int", float: "float", list: "list"}
-
         msg = (
             "The value returned by the deploy-time function for "
             "the parameter *%s* field *%s* has a wrong type. "
             % (self.parameter_name, self.field)
         )
 
-        if self.parameter_type in TYPES:
-            if type(val) != self.parameter_type:
-                msg += "Expected a %s." % TYPES[self.parameter_type]
+        if self.parameter_type in _DEPLOYTIME_TYPE_NAMES:
+            if type(val) is not self.parameter_type:
+                msg += "Expected a %s." % _DEPLOYTIME_TYPE_NAMES[self.parameter_type]
                 raise ParameterFieldTypeMismatch(msg)
             return str(val) if self.return_str else val
         else:
@@ -235,15 +296,25 @@ class DeployTimeField(object):
     def description(self):
         return self.print_representation
 
+    def _evaluated_representation(self):
+        # Evaluating the user function for display is expensive; reuse the result
+        # until the parameter context changes
+        proto = context_proto
+        cached_proto, val = self._str_cache
+        if cached_proto is not proto:
+            val = self()
+            self._str_cache = (proto, val)
+        return val
+
     def __str__(self):
         if self.user_print_representation:
             return self.user_print_representation
-        return self()
+        return self._evaluated_representation()
 
     def __repr__(self):
         if self.user_print_representation:
             return self.user_print_representation
-        return self()
+        return self._evaluated_representation()
 
 
 def deploy_time_eval(value):
@@ -358,6 +429,10 @@ class Parameter(object):
         **kwargs: Dict[str, Any]
     ):
         self.name = name
+        # Normalized key under which click passes this parameter's value; fixed at
+        # construction, so compute it once instead of on every run
+        self._kwarg_key = name.replace("-", "_").lower()
+        self._cli_flag = "--" + name
         self.kwargs = kwargs
         for k, v in {
             "default": default,
@@ -404,6 +479,23 @@ class Parameter(object):
                 name, param_type, "default", self.kwargs["default"], return_str=True
             )
 
+        # Callable values can only reach `set_parameters` when the default is a
+        # DeployTimeField or the click type may convert to a
+        # DelayedEvaluationParameter (e.g. IncludeFile's FilePathClass);
+        # primitive-typed parameters can skip the per-value callable() probe
+        self._supports_callable_value = isinstance(
+            self.kwargs.get("default"), DeployTimeField
+        ) or not (
+            param_type in (str, bool, int, float)
+            or isinstance(param_type, JSONTypeClass)
+        )
+
+        # Invariant once kwargs are settled (including the DeployTimeField wrapping
+        # above); compute it here instead of on every `is_string_type` read
+        self._is_string_type = self.kwargs.get("type", str) is str and isinstance(
+            self.kwargs.get("default", ""), strtype
+        )
+
         # note that separator doesn't work with DeployTimeFields unless you
         # specify type=str
         self.separator = self.kwargs.pop("separator", None)
@@ -413,18 +505,22 @@ class Parameter(object):
                 "for string parameters." % name
             )
 
-    def option_kwargs(self, deploy_mode):
-        kwargs = self.kwargs
-        if isinstance(kwargs.get("default"), DeployTimeField) and not deploy_mode:
-            ret = dict(kwargs)
-            help_msg = kwargs.get("help")
+        # kwargs are settled at this point; precompute the non-deploy-mode override
+        # dict for `option_kwargs` instead of copying kwargs on every call
+        self._deploy_kwargs_override = None
+        if isinstance(self.kwargs.get("default"), DeployTimeField):
+            ret = dict(self.kwargs)
+            help_msg = self.kwargs.get("help")
             help_msg = "" if help_msg is None else help_msg
             ret["help"] = help_msg + "[default: deploy-time value of '%s']" % self.name
             ret["default"] = None
             ret["required"] = False
-            return ret
-        else:
-            return kwargs
+            self._deploy_kwargs_override = ret
+
+    def option_kwargs(self, deploy_mode):
+        if self._deploy_kwargs_override is None or deploy_mode:
+            return self.kwargs
+        return self._deploy_kwargs_override
 
     def load_parameter(self, v):
         return v
@@ -440,9 +536,7 @@ class Parameter(object):
 
     @property
     def is_string_type(self):
-        return self.kwargs.get("type", str) == str and isinstance(
-            self.kwargs.get("default", ""), strtype
-        )
+        return self._is_string_type
 
     # this is needed to appease Pylint for JSONType'd parameters,
     # which may do self.param['foobar']
@@ -495,24 +589,24 @@ def add_custom_cmd_parameters(cmd, deploy_mode=None):
     # `clear_main_flow`)
     assert not param_opts
 
-    # Iterate over parameters in reverse order so cmd.params lists options
-    # in the order they are defined in the FlowSpec subclass
-    params = list(_parameters[_flow].values())
-    for param in params[::-1]:
-        kwargs = param.option_kwargs(deploy_mode)
-        opt = click.Option(("--" + param.name,), **kwargs)
-
-        # Add this option to the command, as well as to our record of param-options we've added (for later removal, in
-        # case a different flow is run)
-        cmd.params.insert(0, opt)
-        param_opts.insert(0, opt)
+    # Build the options in declaration order and prepend them to cmd.params with a
+    # single splice (inserting at index 0 per option would shift the list each time),
+    # recording them in param_opts for later removal in case a different flow is run
+    new_opts = [
+        click.Option((param._cli_flag,), **param.option_kwargs(deploy_mode))
+        for _, param in _parameters[_flow]
+    ]
+    cmd.params[:0] = new_opts
+    param_opts[:] = new_opts
 
     return cmd
 
 
 def set_parameters(flow, kwargs):
+    flow._success = True
+    # Case-insensitive duplicate detection and assignment in a single pass
     seen = set()
-    for var, param in flow._get_parameters():
+    for var, param in _params_list(flow):
         norm = param.name.lower()
         if norm in seen:
             raise MetaflowException(
@@ -521,14 +615,10 @@ def set_parameters(flow, kwargs):
                 "case-insensitive." % param.name
             )
         seen.add(norm)
-
-    flow._success = True
-    for var, param in flow._get_parameters():
-        k = param.name.replace("-", "_").lower()
-        val = kwargs[k]
+        val = kwargs[param._kwarg_key]
         # Support for delayed evaluation of parameters. This is used for
         # includefile in particular
-        if callable(val):
+        if param._supports_callable_value and callable(val):
             val = val()
         val = val.split(param.separator) if val and param.separator else val
         setattr(flow, var, val)
@@ -0,0 +1,80 @@
+"""Long-lived CLI worker for the test harness
+
+Spawning a fresh ``metaflow`` process per CLI test pays interpreter + import startup
+(hundreds of ms) per invocation, dwarfing the logic under test. This worker imports
+metaflow once and then serves CLI invocations over a line-delimited JSON protocol:
+each request is ``{"argv": [...]}`` on stdin, each reply is
+``{"rc": int, "out": <base64>, "err": <base64>}`` on the worker's original stdout.
+
+Output is captured at the fd level (not via ``redirect_stdout``) so that output
+written by task subprocesses spawned during ``run`` commands is captured too.
+"""
+import base64
+import json
+import os
+import sys
+import tempfile
+
+
+def _invoke(argv):
+    """Invoke the `metaflow` CLI entrypoint in-process, returning its exit code"""
+    from metaflow.cmd.main_cli import start
+
+    try:
+        start.main(args=argv, prog_name="metaflow", standalone_mode=True)
+    except SystemExit as e:
+        code = e.code
+        if code is None:
+            return 0
+        return code if isinstance(code, int) else 1
+    return 0
+
+
+def _capture(argv):
+    """Run `_invoke(argv)` with fds 1/2 redirected to temp files; return (rc, out, err)"""
+    saved_out = os.dup(1)
+    saved_err = os.dup(2)
+    with tempfile.TemporaryFile() as out_f, tempfile.TemporaryFile() as err_f:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(out_f.fileno(), 1)
+        os.dup2(err_f.fileno(), 2)
+        try:
+            try:
+                rc = _invoke(argv)
+            except BaseException:
+                import traceback
+
+                traceback.print_exc()
+                rc = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_out, 1)
+            os.dup2(saved_err, 2)
+            os.close(saved_out)
+            os.close(saved_err)
+        out_f.seek(0)
+        out = out_f.read()
+        err_f.seek(0)
+        err = err_f.read()
+    return rc, out, err
+
+
+def main():
+    # Keep a private dup of the original stdout for replies; fd 1 itself is redirected
+    # into a temp file for the duration of each request
+    reply = os.fdopen(os.dup(1), "wb", buffering=0)
+    for line in sys.stdin.buffer:
+        req = json.loads(line)
+        rc, out, err = _capture(req["argv"])
+        resp = {
+            "rc": rc,
+            "out": base64.b64encode(out).decode("ascii"),
+            "err": base64.b64encode(err).decode("ascii"),
+        }
+        reply.write(json.dumps(resp).encode("ascii") + b"\n")
+
+
+if __name__ == "__main__":
+    main()
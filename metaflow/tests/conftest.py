@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+# Give each pytest session -- and each pytest-xdist worker within it -- a fresh local
+# datastore, so the run-count assertions in `utils.run` can't race concurrent workers or
+# see leftover runs in a shared db. This must happen before metaflow is imported, since
+# metaflow_config reads the env var at import time. Workers inherit the controller's
+# environ (including the root the controller's own conftest import set), so when
+# PYTEST_XDIST_WORKER is present always (re)assign a worker-specific root rather than
+# deferring to the inherited one.
+_worker = os.environ.get("PYTEST_XDIST_WORKER")
+if _worker is not None or "METAFLOW_DATASTORE_SYSROOT_LOCAL" not in os.environ:
+    os.environ["METAFLOW_DATASTORE_SYSROOT_LOCAL"] = tempfile.mkdtemp(
+        prefix="metaflow-ds-%s-" % (_worker or "main")
+    )
+
+import pytest
+
+from metaflow.tests import utils
+
+# Import the shared test flows eagerly: constructing each FlowSpec class runs the
+# metaclass (graph build + validation), so trigger that once up front rather than
+# interleaved with the first test module that happens to import each flow. Python's
+# module cache makes the per-module imports in the test files no-ops afterwards.
+import metaflow.tests.flows  # noqa: E402,F401
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cli_worker():
+    """Tear down the long-lived CLI worker (spawned lazily by `utils.cli_run`) at session end"""
+    yield
+    utils.stop_cli_worker()
@@ -0,0 +1,80 @@
+"""Golden data for metaflow.tests.test_joins
+
+Kept in a non-test module as top-level tuples: pytest's assertion rewriting doesn't
+reprocess this module on every collection, tuples load faster from the .pyc than lists,
+and compile-time interning dedupes the keys repeated across the structures.
+"""
+
+# fmt: off
+JOINS_GRAPH = (
+    { "name":         "start", "type":   "start", "in_funcs": [               ], "out_funcs": ["generate_ints"], "split_parents": [               ], },
+    { "name": "generate_ints", "type": "foreach", "in_funcs": [        "start"], "out_funcs": [   "test_prime"], "split_parents": [               ], },
+    { "name":    "test_prime", "type":  "linear", "in_funcs": ["generate_ints"], "out_funcs": [     "fizzbuzz"], "split_parents": ["generate_ints"], },
+    { "name":      "fizzbuzz", "type":  "linear", "in_funcs": [   "test_prime"], "out_funcs": [         "join"], "split_parents": ["generate_ints"], },
+    { "name":          "join", "type":    "join", "in_funcs": [     "fizzbuzz"], "out_funcs": [          "end"], "split_parents": ["generate_ints"], },
+    { "name":           "end", "type":     "end", "in_funcs": [         "join"], "out_funcs": [               ], "split_parents": [               ], },
+)
+
+
+RESULTS = (
+    { "n":  1, "is_prime": False,                        },
+    { "n":  2, "is_prime":  True,                        },
+    { "n":  3, "is_prime":  True, "fizzbuzz":     "fizz" },
+    { "n":  4, "is_prime": False,                        },
+    { "n":  5, "is_prime":  True, "fizzbuzz":     "buzz" },
+    { "n":  6, "is_prime": False, "fizzbuzz":     "fizz" },
+    { "n":  7, "is_prime":  True,                        },
+    { "n":  8, "is_prime": False,                        },
+    { "n":  9, "is_prime": False, "fizzbuzz":     "fizz" },
+    { "n": 10, "is_prime": False, "fizzbuzz":     "buzz" },
+    { "n": 11, "is_prime":  True,                        },
+    { "n": 12, "is_prime": False, "fizzbuzz":     "fizz" },
+    { "n": 13, "is_prime":  True,                        },
+    { "n": 14, "is_prime": False,                        },
+    { "n": 15, "is_prime": False, "fizzbuzz": "fizzbuzz" },
+)
+
+
+ODDS = (
+    { "n":  1, "is_prime": False,                        },
+    { "n":  3, "is_prime":  True, "fizzbuzz":     "fizz" },
+    { "n":  5, "is_prime":  True, "fizzbuzz":     "buzz" },
+    { "n":  7, "is_prime":  True,                        },
+    { "n":  9, "is_prime": False, "fizzbuzz":     "fizz" },
+    { "n": 11, "is_prime":  True,                        },
+    { "n": 13, "is_prime":  True,                        },
+    { "n": 15, "is_prime": False, "fizzbuzz": "fizzbuzz" },
+)
+
+
+JOIN_FLOW2_GRAPH = (
+    { "name":         "start", "type":   "start", "in_funcs": [               ], "out_funcs": ["generate_ints"], "split_parents": [               ], },
+    { "name": "generate_ints", "type": "foreach", "in_funcs": [        "start"], "out_funcs": [   "test_prime"], "split_parents": [               ], },
+    { "name":    "test_prime", "type":  "linear", "in_funcs": ["generate_ints"], "out_funcs": [     "fizzbuzz"], "split_parents": ["generate_ints"], },
+    { "name":      "fizzbuzz", "type":  "linear", "in_funcs": [   "test_prime"], "out_funcs": [         "join"], "split_parents": ["generate_ints"], },
+    { "name":          "join", "type":    "join", "in_funcs": [     "fizzbuzz"], "out_funcs": [  "filter_odds"], "split_parents": ["generate_ints"], },
+    { "name":   "filter_odds", "type":  "linear", "in_funcs": [         "join"], "out_funcs": [          "end"], "split_parents": [               ], },
+    { "name":           "end", "type":     "end", "in_funcs": [  "filter_odds"], "out_funcs": [               ], "split_parents": [               ], },
+)
+
+
+BRANCHING_GRAPH = (
+    { "name": "start", "type":  "start", "in_funcs": [            ], "out_funcs": [       "one"], "split_parents": [     ], },
+    { "name":   "one", "type":  "split", "in_funcs": [     "start"], "out_funcs": ["aaa", "bbb"], "split_parents": [     ], },
+    { "name":   "aaa", "type": "linear", "in_funcs": [       "one"], "out_funcs": [      "join"], "split_parents": ["one"], },
+    { "name":   "bbb", "type": "linear", "in_funcs": [       "one"], "out_funcs": [      "join"], "split_parents": ["one"], },
+    { "name":  "join", "type":   "join", "in_funcs": ["aaa", "bbb"], "out_funcs": [       "end"], "split_parents": ["one"], },
+    { "name":   "end", "type":    "end", "in_funcs": [      "join"], "out_funcs": [            ], "split_parents": [     ], },
+)
+
+
+FOREACH_SPLIT_GRAPH = (
+    { "name":        "start", "type": "foreach", "in_funcs": [                ], "out_funcs": [      "foreach" ], "split_parents": [                    ], },
+    { "name":      "foreach", "type":   "split", "in_funcs": [        "start" ], "out_funcs": [     "f1", "f2" ], "split_parents": [ "start",           ], },
+    { "name":           "f1", "type":  "linear", "in_funcs": [      "foreach" ], "out_funcs": [           "f3" ], "split_parents": [ "start", "foreach" ], },
+    { "name":           "f2", "type":  "linear", "in_funcs": [      "foreach" ], "out_funcs": [           "f3" ], "split_parents": [ "start", "foreach" ], },
+    { "name":           "f3", "type":    "join", "in_funcs": [     "f1", "f2" ], "out_funcs": [ "join_foreach" ], "split_parents": [ "start", "foreach" ], },
+    { "name": "join_foreach", "type":    "join", "in_funcs": [           "f3" ], "out_funcs": [          "end" ], "split_parents": [ "start",           ], },
+    { "name":          "end", "type":     "end", "in_funcs": [ "join_foreach" ], "out_funcs": [                ], "split_parents": [                    ], },
+)
+# fmt: on
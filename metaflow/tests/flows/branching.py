@@ -2,6 +2,10 @@ from metaflow import FlowSpec
 import metaflow.api as ma
 from metaflow.api import step, join
 
+_N = 11
+_A = "A" * _N
+_B = "B" * _N
+
 
 class OldBranchingFlow(FlowSpec):
     """Example flow demonstrating a simple split+join pattern"""
@@ -12,25 +16,26 @@ class OldBranchingFlow(FlowSpec):
 
     @step
     def one(self):
-        self.n = 11
+        self.n = _N
         self.next(self.aaa, self.bbb)
 
     @step
     def aaa(self):
-        self._aaa = "A" * self.n
+        self._aaa = _A
         self.next(self.join)
 
     @step
     def bbb(self):
-        self._bbb = "B" * self.n
+        self._bbb = _B
         self.next(self.join)
 
     @step
     def join(self, inputs):
-        assert (inputs.aaa._aaa, inputs.bbb._bbb) == ("AAAAAAAAAAA", "BBBBBBBBBBB")
+        assert (inputs.aaa._aaa, inputs.bbb._bbb) == (_A, _B)
         self.a, self.b = (inputs.aaa._aaa, inputs.bbb._bbb)
         assert not hasattr(self, "n")
-        [self.n] = {inputs.aaa.n, inputs.bbb.n}
+        assert inputs.aaa.n == inputs.bbb.n
+        self.n = inputs.aaa.n
         self.done = True
         self.next(self.end)
 
@@ -42,20 +47,21 @@ class OldBranchingFlow(FlowSpec):
 class NewBranchingFlow(ma.FlowSpec):
     @step
     def one(self):
-        self.n = 11
+        self.n = _N
 
     @step("one")
     def aaa(self):
-        self._aaa = "A" * self.n
+        self._aaa = _A
 
     @step("one")
     def bbb(self):
-        self._bbb = "B" * self.n
+        self._bbb = _B
 
     @join("aaa", "bbb")
     def join(self, inputs):
-        assert (inputs.aaa._aaa, inputs.bbb._bbb) == ("AAAAAAAAAAA", "BBBBBBBBBBB")
+        assert (inputs.aaa._aaa, inputs.bbb._bbb) == (_A, _B)
         self.a, self.b = (inputs.aaa._aaa, inputs.bbb._bbb)
         assert not hasattr(self, "n")
-        [self.n] = {inputs.aaa.n, inputs.bbb.n}
+        assert inputs.aaa.n == inputs.bbb.n
+        self.n = inputs.aaa.n
         self.done = True
@@ -8,16 +8,22 @@ from metaflow.tests.utils import (
     metaflow_version,
     test_flows_dir,
     run,
+    user,
     verify_output,
     py37dec,
 )
-from metaflow.util import resolve_identity
 
 
 def flow_path(name):
     return join(test_flows_dir, name)
 
 
+# Version substitution frozen once at import; only flow/user vary per test
+show_stderr_tmpl = "Metaflow {version} executing {{flow}} for {{user}}\n\n\n\n".format(
+    version=metaflow_version
+)
+
+
 # fmt: off
 aaa_step = { "name":  "aaa", "type": "linear", "in_funcs": ["start"], "out_funcs": ["bbb"], "split_parents": [], "file": flow_path("new_linear_flows.py"), "func_lineno": py37dec(7), }
 bbb_step = { "name":  "bbb", "type": "linear", "in_funcs": [  "aaa"], "out_funcs": ["ccc"], "split_parents": [], "file": flow_path("new_linear_flows.py"), "func_lineno": py37dec(11), }
@@ -75,7 +81,6 @@ def test_flow123():
 
 
 def test_flow123_show():
-    user = resolve_identity()
     cmd = [metaflow_bin, "flow", Flow123.path_spec, "show"]
     stdout = """
 Step start
@@ -109,11 +114,7 @@ Step fff
     ?
     => end
 """
-    stderr = "Metaflow {version} executing {flow} for {user}\n\n\n\n".format(
-        version=metaflow_version,
-        flow="Flow123",
-        user=user,
-    )
+    stderr = show_stderr_tmpl.format(flow="Flow123", user=user)
     verify_output(cmd, stdout, stderr)
 
 
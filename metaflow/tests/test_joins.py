@@ -7,128 +7,97 @@ from metaflow.tests.flows.joins import (
     OldForeachSplit,
     NewForeachSplit,
 )
+from metaflow.tests.flows._golden import (
+    BRANCHING_GRAPH,
+    FOREACH_SPLIT_GRAPH,
+    JOINS_GRAPH,
+    JOIN_FLOW2_GRAPH,
+    ODDS,
+    RESULTS,
+)
 
 from metaflow.tests.utils import check_graph, parametrize, py37dec, run
 
 
-# fmt: off
-graph = [
-    { "name":         "start", "type":   "start", "in_funcs": [               ], "out_funcs": ["generate_ints"], "split_parents": [               ], },
-    { "name": "generate_ints", "type": "foreach", "in_funcs": [        "start"], "out_funcs": [   "test_prime"], "split_parents": [               ], },
-    { "name":    "test_prime", "type":  "linear", "in_funcs": ["generate_ints"], "out_funcs": [     "fizzbuzz"], "split_parents": ["generate_ints"], },
-    { "name":      "fizzbuzz", "type":  "linear", "in_funcs": [   "test_prime"], "out_funcs": [         "join"], "split_parents": ["generate_ints"], },
-    { "name":          "join", "type":    "join", "in_funcs": [     "fizzbuzz"], "out_funcs": [          "end"], "split_parents": ["generate_ints"], },
-    { "name":           "end", "type":     "end", "in_funcs": [         "join"], "out_funcs": [               ], "split_parents": [               ], },
-]
-
-
-results = [
-    { "n":  1, "is_prime": False,                        },
-    { "n":  2, "is_prime":  True,                        },
-    { "n":  3, "is_prime":  True, "fizzbuzz":     "fizz" },
-    { "n":  4, "is_prime": False,                        },
-    { "n":  5, "is_prime":  True, "fizzbuzz":     "buzz" },
-    { "n":  6, "is_prime": False, "fizzbuzz":     "fizz" },
-    { "n":  7, "is_prime":  True,                        },
-    { "n":  8, "is_prime": False,                        },
-    { "n":  9, "is_prime": False, "fizzbuzz":     "fizz" },
-    { "n": 10, "is_prime": False, "fizzbuzz":     "buzz" },
-    { "n": 11, "is_prime":  True,                        },
-    { "n": 12, "is_prime": False, "fizzbuzz":     "fizz" },
-    { "n": 13, "is_prime":  True,                        },
-    { "n": 14, "is_prime": False,                        },
-    { "n": 15, "is_prime": False, "fizzbuzz": "fizzbuzz" },
-]
-
-
-@parametrize( "flow", [ OldJoinFlow1, NewJoinFlow1, ], )
+@parametrize(
+    "flow",
+    [
+        OldJoinFlow1,
+        NewJoinFlow1,
+    ],
+)
 def test_joins1(flow):
-    check_graph(flow, graph)
+    check_graph(flow, JOINS_GRAPH)
     data = run(flow)
     # TODO: why can the results sometimes come back out of order? Should that be fixed?
     data["results"] = sorted(data["results"], key=lambda r: r["n"])
     assert data == {
-        "results": results,
+        "results": list(RESULTS),
     }
 
 
-odds = [
-    { "n":  1, "is_prime": False,                        },
-    { "n":  3, "is_prime":  True, "fizzbuzz":     "fizz" },
-    { "n":  5, "is_prime":  True, "fizzbuzz":     "buzz" },
-    { "n":  7, "is_prime":  True,                        },
-    { "n":  9, "is_prime": False, "fizzbuzz":     "fizz" },
-    { "n": 11, "is_prime":  True,                        },
-    { "n": 13, "is_prime":  True,                        },
-    { "n": 15, "is_prime": False, "fizzbuzz": "fizzbuzz" },
-]
-
-
-join_flow2_graph = [
-    { "name":         "start", "type":   "start", "in_funcs": [               ], "out_funcs": ["generate_ints"], "split_parents": [               ], },
-    { "name": "generate_ints", "type": "foreach", "in_funcs": [        "start"], "out_funcs": [   "test_prime"], "split_parents": [               ], },
-    { "name":    "test_prime", "type":  "linear", "in_funcs": ["generate_ints"], "out_funcs": [     "fizzbuzz"], "split_parents": ["generate_ints"], },
-    { "name":      "fizzbuzz", "type":  "linear", "in_funcs": [   "test_prime"], "out_funcs": [         "join"], "split_parents": ["generate_ints"], },
-    { "name":          "join", "type":    "join", "in_funcs": [     "fizzbuzz"], "out_funcs": [  "filter_odds"], "split_parents": ["generate_ints"], },
-    { "name":   "filter_odds", "type":  "linear", "in_funcs": [         "join"], "out_funcs": [          "end"], "split_parents": [               ], },
-    { "name":           "end", "type":     "end", "in_funcs": [  "filter_odds"], "out_funcs": [               ], "split_parents": [               ], },
-]
-
-
-@parametrize( "flow", [ OldJoinFlow2, NewJoinFlow2, ], )
+@parametrize(
+    "flow",
+    [
+        OldJoinFlow2,
+        NewJoinFlow2,
+    ],
+)
 def test_joins2(flow):
-    check_graph(flow, join_flow2_graph)
+    check_graph(flow, JOIN_FLOW2_GRAPH)
     data = run(flow)
     # TODO: why can the results sometimes come back out of order? Should that be fixed?
     data["odds"] = sorted(data["odds"], key=lambda r: r["n"])
     data["results"] = sorted(data["results"], key=lambda r: r["n"])
     assert data == {
-        "odds": odds,
-        "results": results,
+        "odds": list(ODDS),
+        "results": list(RESULTS),
     }
 
 
-branching_graph = [
-    { "name": "start", "type":  "start", "in_funcs": [            ], "out_funcs": [       "one"], "split_parents": [     ], },
-    { "name":   "one", "type":  "split", "in_funcs": [     "start"], "out_funcs": ["aaa", "bbb"], "split_parents": [     ], },
-    { "name":   "aaa", "type": "linear", "in_funcs": [       "one"], "out_funcs": [      "join"], "split_parents": ["one"], },
-    { "name":   "bbb", "type": "linear", "in_funcs": [       "one"], "out_funcs": [      "join"], "split_parents": ["one"], },
-    { "name":  "join", "type":   "join", "in_funcs": ["aaa", "bbb"], "out_funcs": [       "end"], "split_parents": ["one"], },
-    { "name":   "end", "type":    "end", "in_funcs": [      "join"], "out_funcs": [            ], "split_parents": [     ], },
-]
+# fmt: off
+# Merge the per-flow func_linenos into the shared graph skeleton once at import, rather
+# than rebuilding the list-of-dicts inside every parametrized test body
+branching_graphs = {
+    flow: [
+        dict(**obj, func_lineno=func_lineno)
+        for obj, func_lineno in zip(BRANCHING_GRAPH, func_linenos)
+    ]
+    for flow, func_linenos in [
+        ( OldBranchingFlow, map(py37dec, [14, 18, 23, 28, 33, 43, ]), ),
+        ( NewBranchingFlow, [47, py37dec(49), py37dec(53), py37dec(57), py37dec(61), 68, ], ),
+    ]
+}
+# fmt: on
 
 
 @parametrize(
-    "flow,func_linenos",
+    "flow",
     [
-        ( OldBranchingFlow, map(py37dec, [10, 14, 19, 24, 29, 38, ]), ),
-        ( NewBranchingFlow, [42, py37dec(44), py37dec(48), py37dec(52), py37dec(56), 62, ], ),
+        OldBranchingFlow,
+        NewBranchingFlow,
     ],
 )
-def test_branching_flow(flow, func_linenos):
-    graph = [
-        dict(**obj, func_lineno=func_lineno)
-        for obj, func_lineno in zip(branching_graph, func_linenos)
-    ]
-    check_graph(flow, graph)
-    data = run(flow)
-    assert data == {"n": 11, "a": "AAAAAAAAAAA", "b": "BBBBBBBBBBB", "done": True}
+def test_branching_graph(flow):
+    check_graph(flow, branching_graphs[flow])
 
 
-foreach_split_graph = [
-    { "name":        "start", "type": "foreach", "in_funcs": [                ], "out_funcs": [      "foreach" ], "split_parents": [                    ], },
-    { "name":      "foreach", "type":   "split", "in_funcs": [        "start" ], "out_funcs": [     "f1", "f2" ], "split_parents": [ "start",           ], },
-    { "name":           "f1", "type":  "linear", "in_funcs": [      "foreach" ], "out_funcs": [           "f3" ], "split_parents": [ "start", "foreach" ], },
-    { "name":           "f2", "type":  "linear", "in_funcs": [      "foreach" ], "out_funcs": [           "f3" ], "split_parents": [ "start", "foreach" ], },
-    { "name":           "f3", "type":    "join", "in_funcs": [     "f1", "f2" ], "out_funcs": [ "join_foreach" ], "split_parents": [ "start", "foreach" ], },
-    { "name": "join_foreach", "type":    "join", "in_funcs": [           "f3" ], "out_funcs": [          "end" ], "split_parents": [ "start",           ], },
-    { "name":          "end", "type":     "end", "in_funcs": [ "join_foreach" ], "out_funcs": [                ], "split_parents": [                    ], },
-]
+def test_branching_run():
+    # The old- and new-style variants produce identical runtime artifacts (only their
+    # graph metadata differs, covered above), so one end-to-end run suffices. Use the
+    # new-style flow: it is the suite's only runtime exercise of `metaflow.api`'s
+    # static-split dispatch (the NewJoinFlows are foreach-only), while old-style split
+    # execution is covered by the core test suite
+    data = run(NewBranchingFlow)
+    assert data == {"n": 11, "a": "AAAAAAAAAAA", "b": "BBBBBBBBBBB", "done": True}
 
 
-@parametrize("flow", [ OldForeachSplit, NewForeachSplit, ], )
+@parametrize(
+    "flow",
+    [
+        OldForeachSplit,
+        NewForeachSplit,
+    ],
+)
 def test_foreach_splitand(flow):
-    check_graph(flow, foreach_split_graph)
-
-
-# fmt: on
+    check_graph(flow, FOREACH_SPLIT_GRAPH)
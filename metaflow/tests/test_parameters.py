@@ -70,53 +70,27 @@ def test_parameter_flow1(flow, sdk, debug, msg):
     }
 
 
+# fmt: off
 @parametrize(
-    "Flow2",
+    "flow,args,expect",
     [
-        ParameterFlow2,
-        NewParameterFlow2,
+        (    ParameterFlow2, ["run", "--str",  "bbb"], {"string":  "bbb", "upper":    "BBB"}, ),
+        (    ParameterFlow2, ["run", "--int",  "111"], NoSuchOption,                          ),
+        ( NewParameterFlow3, ["run", "--int",   "11"], {   "int":     11, "squared":    121}, ),
+        ( NewParameterFlow3, ["run", "--str",  "ddd"], NoSuchOption,                          ),
+        ( NewParameterFlow2, ["run", "--str", "cccc"], {"string": "cccc", "upper":   "CCCC"}, ),
+        ( NewParameterFlow2, ["run", "--int",  "111"], NoSuchOption,                          ),
+        (    ParameterFlow3, ["run", "--int",  "100"], {   "int":    100, "squared": 10_000}, ),
+        (    ParameterFlow3, ["run", "--str",  "ddd"], NoSuchOption,                          ),
     ],
 )
-@parametrize(
-    "Flow3",
-    [
-        ParameterFlow3,
-        NewParameterFlow3,
-    ],
-)
-def test_clear_main_flow(Flow2, Flow3):
-    # Normal Flow2 run with "--str" flag
-    data = run(Flow2, args=["run", "--str", "bbb"])
-    assert data == {
-        "string": "bbb",
-        "upper": "BBB",
-    }
-
-    # Flow3's "--int" flag is not allowed
-    with raises(NoSuchOption):
-        run(Flow2, args=["run", "--int", "111"])
-
-    # Flow2/"--str" still works
-    data = run(Flow2, args=["run", "--str", "cccc"])
-    assert data == {
-        "string": "cccc",
-        "upper": "CCCC",
-    }
-
-    # Switch to Flow3 / "--int" flag
-    data = run(Flow3, args=["run", "--int", "11"])
-    assert data == {
-        "int": 11,
-        "squared": 121,
-    }
-
-    # Flow2's "--str" flag is not allowed
-    with raises(NoSuchOption):
-        run(Flow3, args=["run", "--str", "ddd"])
-
-    # Flow3/"--int" still works
-    data = run(Flow3, args=["run", "--int", "100"])
-    assert data == {
-        "int": 100,
-        "squared": 10_000,
-    }
+# fmt: on
+def test_clear_main_flow(flow, args, expect):
+    """Each `run` registers its flow as the main flow (clearing the previous one); the
+    rows above alternate flows so successive cases exercise the main-flow switch, and
+    the NoSuchOption rows verify the other flow's flags don't leak across it."""
+    if isinstance(expect, type) and issubclass(expect, BaseException):
+        with raises(expect):
+            run(flow, args=args)
+    else:
+        assert run(flow, args=args) == expect
@@ -1,6 +1,9 @@
+import base64
+import functools
+import json
 from os.path import dirname, join
 import subprocess
-from subprocess import check_call, PIPE
+from subprocess import CalledProcessError, PIPE, Popen
 from sys import executable as python, version_info
 
 import pytest
@@ -9,8 +12,21 @@ parametrize = pytest.mark.parametrize
 
 from metaflow import Flow
 import metaflow.metaflow_version
-from metaflow.exception import MetaflowNotFound
+from metaflow.exception import MetaflowNotFound, MetaflowUnknownUser
 from metaflow.parameters import register_main_flow
+from metaflow.util import resolve_identity
+
+# `resolve_identity` hits env vars / getpass on every call but is invariant for the
+# duration of a test session; cache it, and resolve the identity every CLI test embeds
+# in its expected output once at import. Resolution can fail (no $USER/$USERNAME in the
+# environment); fall back to None so importing this module -- which conftest does for
+# every test session -- doesn't turn an identity problem into a collection error for the
+# whole suite. Only the CLI-output tests that embed `user` then fail, with a clear diff.
+resolve_identity = functools.lru_cache(maxsize=1)(resolve_identity)
+try:
+    user = resolve_identity()
+except MetaflowUnknownUser:
+    user = None
 
 
 metaflow_bin = join(dirname(python), "metaflow")
@@ -26,6 +42,70 @@ def flow_path(name):
     return join(test_flows_dir, name)
 
 
+# Long-lived `metaflow` CLI worker (see metaflow.tests.cli_server): spawned lazily on the
+# first routable CLI command and reused for the rest of the session, amortizing
+# interpreter + import startup across the many CLI invocations the tests make
+_cli_worker = None
+
+
+def start_cli_worker():
+    global _cli_worker
+    if _cli_worker is None:
+        # close_fds=False skips the pre-exec fd-closing sweep; the test runner keeps a
+        # small fd table and the worker is trusted, so inheriting fds is harmless
+        _cli_worker = Popen(
+            [python, "-u", "-m", "metaflow.tests.cli_server"],
+            stdin=PIPE,
+            stdout=PIPE,
+            close_fds=False,
+        )
+    return _cli_worker
+
+
+def stop_cli_worker():
+    global _cli_worker
+    if _cli_worker is not None:
+        _cli_worker.stdin.close()
+        _cli_worker.wait()
+        _cli_worker = None
+
+
+def _cli_argv(cmd):
+    """Translate a harness command into worker argv, or None if it must run as a real subprocess
+
+    `metaflow …` and `python -m metaflow.cmd.main_cli …` share the same entrypoint
+    (`main_cli:start`, per setup.py's console_scripts) and can be served by the worker;
+    `python <file> …` needs a real argv[0] and falls through to subprocess."""
+    if cmd[0] == metaflow_bin:
+        return list(cmd[1:])
+    if cmd[0] == python and cmd[1:3] == ["-m", "metaflow.cmd.main_cli"]:
+        return list(cmd[3:])
+    return None
+
+
+def cli_run(cmd):
+    """Run a CLI command, via the long-lived worker when possible; returns a CompletedProcess"""
+    argv = _cli_argv(cmd)
+    if argv is None:
+        # subprocess.run drains both pipes via a selector loop internally and returns as
+        # soon as the child exits and the pipes close; no extra polling needed here
+        return subprocess.run(cmd, stdout=PIPE, stderr=PIPE, close_fds=False)
+    p = start_cli_worker()
+    p.stdin.write((json.dumps({"argv": argv}) + "\n").encode("ascii"))
+    p.stdin.flush()
+    line = p.stdout.readline()
+    if not line:
+        stop_cli_worker()
+        raise RuntimeError("CLI worker died while running: %s" % " ".join(cmd))
+    resp = json.loads(line)
+    return subprocess.CompletedProcess(
+        cmd,
+        resp["rc"],
+        stdout=base64.b64decode(resp["out"]),
+        stderr=base64.b64decode(resp["err"]),
+    )
+
+
 # Run a flow, verify Metaflow sees one new run of that type, and return that run's data
 def run(flow, fn=None, cmd=None, args=None, entrypoint=None):
     if isinstance(flow, str):
@@ -44,7 +124,11 @@ def run(flow, fn=None, cmd=None, args=None, entrypoint=None):
         n_runs_before = 0
 
     if cmd:
-        check_call(cmd)
+        p = cli_run(cmd)
+        if p.returncode:
+            raise CalledProcessError(
+                p.returncode, cmd, output=p.stdout, stderr=p.stderr
+            )
     else:
         register_main_flow(flow, overwrite=True)
 
@@ -55,7 +139,7 @@ def run(flow, fn=None, cmd=None, args=None, entrypoint=None):
 
     runs = list(Flow(name))
     n_runs_after = len(runs)
-    # TODO: more rigorously verify we are grabbing the sole new run / use a tmpdir as metaflow db
+    # TODO: more rigorously verify we are grabbing the sole new run
     assert (
         n_runs_before + 1 == n_runs_after
     ), "n_runs_before=%d + 1 != n_runs_after=%d" % (n_runs_before, n_runs_after)
@@ -79,10 +163,35 @@ def check_graph(flow_spec, expected):
     flow = flow_spec(use_cli=False)
     graph = flow._graph
     nodes = graph.nodes
-    actual = []
+
+    # Fast path: compare canonical (col, value) tuples — one tuple equality instead of a
+    # recursive list-of-dicts compare; list-valued fields are tupled so rows hash/compare
+    # cheaply. Only fall back to building the dict representation (for a readable diff)
+    # when the canonical forms differ. (At these sizes — ≤7 cols × ≤15 nodes — building a
+    # pandas DataFrame per side just to use DataFrame.equals would cost more than the
+    # comparison it replaces.)
+    def canon_row(get, has, row):
+        return tuple(
+            (col, tuple(v) if isinstance(v, list) else v)
+            for col in cols
+            if has(row, col)
+            for v in (get(row, col),)
+        )
+
     for k, v in nodes.items():
         assert k == v.name
-        actual.append({col: getattr(v, col) for col in cols if hasattr(v, col)})
+
+    actual_canon = tuple(canon_row(getattr, hasattr, v) for v in nodes.values())
+    expected_canon = tuple(
+        canon_row(dict.get, dict.__contains__, row) for row in expected
+    )
+    if actual_canon == expected_canon:
+        return
+
+    actual = [
+        {col: getattr(v, col) for col in cols if hasattr(v, col)}
+        for v in nodes.values()
+    ]
 
     # pytest doesn't give a clean error msg / diff below, for some reason; pretty-print the `actual` and `expected`
     # values using this helper
@@ -93,17 +202,30 @@ def check_graph(flow_spec, expected):
 
 
 def verify_output(cmd, expected_stdout, expected_stderr):
-    p = subprocess.run(cmd, stdout=PIPE, stderr=PIPE, check=True)
-    actual_stdout = p.stdout.decode()
-    actual_stderr = p.stderr.decode()
-    assert actual_stdout == expected_stdout, '"""%s""" != """%s"""' % (
-        actual_stdout,
-        expected_stdout,
-    )
-    assert actual_stderr == expected_stderr, '"""%s""" != """%s"""' % (
-        actual_stderr,
-        expected_stderr,
-    )
+    p = cli_run(cmd)
+    if p.returncode:
+        raise CalledProcessError(p.returncode, cmd, output=p.stdout, stderr=p.stderr)
+    # Fast path: one bytes equality per stream; only decode and build a readable diff
+    # when a stream actually mismatches
+    for stream, actual, expected in (
+        ("stdout", p.stdout, expected_stdout),
+        ("stderr", p.stderr, expected_stderr),
+    ):
+        if actual != expected.encode():
+            import difflib
+
+            diff = "\n".join(
+                difflib.unified_diff(
+                    expected.splitlines(),
+                    actual.decode().splitlines(),
+                    fromfile="expected %s" % stream,
+                    tofile="actual %s" % stream,
+                    lineterm="",
+                )
+            )
+            raise AssertionError(
+                "%s mismatch for %s:\n%s" % (stream, " ".join(cmd), diff)
+            )
 
 
 def py37dec(a: int, b: int = 1) -> int:
@@ -5,11 +5,17 @@ version = "2.8.1"
 
 dir = dirname(__file__)
 
-with open(join(dir, "requirements.txt"), "r") as f:
-    install_requires = [line.rstrip("\n") for line in f.readlines()]
 
-with open(join(dir, "requirements-test.txt"), "r") as f:
-    tests_require = [line.rstrip("\n") for line in f.readlines()]
+def read_requirements(name):
+    # One pass over the file (no intermediate readlines list), skipping blanks and
+    # stripping comments, per the standard pip-requirements format
+    with open(join(dir, name), "r") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f.read().splitlines())
+        return [line for line in lines if line]
+
+
+install_requires = read_requirements("requirements.txt")
+tests_require = read_requirements("requirements-test.txt")
 
 setup(
     include_package_data=True,